@@ -6,9 +6,82 @@ scoring is more robust to outliers than standard deviation, making it
 well-suited for noisy industrial sensor data.
 """
 
+import math
+from collections.abc import Sequence
+from functools import lru_cache
+from operator import itemgetter
+
 import numpy as np
 
 
+# Batches at or below this size take the pure-Python median path; at these
+# sizes NumPy's per-call dispatch costs more than the selection itself.
+_SMALL_BATCH_SIZE = 32
+
+# Below this many readings the median and MAD carry no useful information
+# (MAD is 0 for a single reading and scores are capped at 0.6745 for two), so
+# scoring is skipped and every reading is reported as normal.
+_MIN_BATCH_SIZE = 3
+
+# Small batches are memoised by their raw bytes: sliding-window deployments
+# frequently resend an identical window, which then skips scoring entirely.
+# Default cache size; see ``AnomalyDetector(score_cache_size=...)``.
+_SCORE_CACHE_SIZE = 32
+_CACHEABLE_BATCH_SIZE = 512
+
+
+def _partition_median(values: np.ndarray) -> np.ndarray:
+    """Median along the last axis, partitioning ``values`` in place.
+
+    Behaves like ``np.median(values, axis=-1, overwrite_input=True)`` but
+    selects only the middle element(s), skipping its NaN checks. The result
+    keeps a trailing axis of length 1 so it broadcasts against the input.
+    Batches of up to ``_SMALL_BATCH_SIZE`` are sorted as Python lists and
+    leave ``values`` untouched; larger ones leave it reordered.
+    """
+    n = values.shape[-1]
+    k = n // 2
+    if n <= _SMALL_BATCH_SIZE:
+        medians = []
+        for row in values.reshape(-1, n).tolist():
+            row.sort()
+            medians.append(row[k] if n % 2 else 0.5 * (row[k - 1] + row[k]))
+        return np.array(medians, dtype=values.dtype).reshape(values.shape[:-1] + (1,))
+    if n % 2:
+        values.partition(k, axis=-1)
+        return values[..., k:k + 1].copy()
+    values.partition((k - 1, k), axis=-1)
+    return 0.5 * (values[..., k - 1:k] + values[..., k:k + 1])
+
+
+_get_sensor_id = itemgetter("sensor_id")
+_get_temperature = itemgetter("temperature")
+_get_vibration = itemgetter("vibration")
+
+
+def split_readings(readings: list[dict]) -> tuple[list, list, list]:
+    """Split reading dicts into ``(sensor_ids, temperatures, vibrations)`` columns.
+
+    Each column is gathered with an ``itemgetter`` mapped over the batch, so
+    field access runs in C rather than as per-reading bytecode. Values are
+    kept exactly as received; :meth:`AnomalyDetector.detect_arrays` converts
+    them for scoring and echoes the originals in its results.
+
+    Raises:
+        KeyError: If any reading lacks one of the required keys.
+    """
+    return (
+        list(map(_get_sensor_id, readings)),
+        list(map(_get_temperature, readings)),
+        list(map(_get_vibration, readings)),
+    )
+
+
+def _as_list(values: Sequence | np.ndarray) -> Sequence:
+    """Return ``values`` as a Python sequence without altering the elements received."""
+    return values.tolist() if isinstance(values, np.ndarray) else values
+
+
 class AnomalyDetector:
     """Detects anomalies in sensor readings using the Modified Z-Score method.
 
@@ -26,30 +99,96 @@ class AnomalyDetector:
     Args:
         threshold: Modified Z-Score above which a reading is flagged.
                    Default of 3.5 is a widely-used conservative choice.
+        verbose_scores: Report ``anomaly_scores`` for every reading. When
+                   False, scores are only reported for flagged readings and
+                   are ``None`` elsewhere, which saves rounding and encoding
+                   them on mostly-normal traffic.
+        score_cache_size: Number of recent batches (under 512 readings)
+                   whose scores are memoised. A cache miss costs a few
+                   extra copies of the batch, so detectors serving mostly
+                   unique traffic can pass 0 to bypass the cache and score
+                   straight from the reusable buffers.
     """
 
     CONSISTENCY_CONSTANT = 0.6745
 
-    def __init__(self, threshold: float = 3.5):
+    def __init__(
+        self,
+        threshold: float = 3.5,
+        verbose_scores: bool = True,
+        score_cache_size: int = _SCORE_CACHE_SIZE,
+    ):
         if threshold <= 0:
             raise ValueError("Threshold must be a positive number")
+        if score_cache_size < 0:
+            raise ValueError("Score cache size must not be negative")
         self.threshold = threshold
+        self.verbose_scores = verbose_scores
+        # Working memory for the in-place median selections and the score
+        # output, grown on demand and reused across warm invocations.
+        self._scratch = np.empty(0)
+        self._buf = np.empty(0)
+        self._cached_scores = (
+            lru_cache(maxsize=score_cache_size)(self._scores_for_key)
+            if score_cache_size else None
+        )
+
+    def _workspace(self, shape: tuple[int, ...]) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(scratch, buf)`` arrays of ``shape`` backed by the reusable buffers."""
+        size = math.prod(shape)
+        if self._buf.size < size:
+            self._scratch = np.empty(size)
+            self._buf = np.empty(size)
+        return self._scratch[:size].reshape(shape), self._buf[:size].reshape(shape)
+
+    def _signed_modified_z_scores(self, data: np.ndarray) -> np.ndarray:
+        """Compute signed Modified Z-Scores along the last axis.
+
+        ``data`` is typically a ``(metrics, N)`` array so that every metric
+        is scored in the same set of vectorised passes. Callers take the
+        magnitude only where they need it. The returned array is a view of
+        an internal buffer and is only valid until the next call.
+        """
+        data = data.astype(float, copy=False)
+
+        scratch, scores = self._workspace(data.shape)
+        if data.shape[-1] <= _SMALL_BATCH_SIZE:
+            median = _partition_median(data)
+        else:
+            # ``data`` must keep its order for the deviations below, so only
+            # an owned copy may be partitioned.
+            np.copyto(scratch, data)
+            median = _partition_median(scratch)
+        np.subtract(data, median, out=scores)
+        np.abs(scores, out=scratch)
+        mad = _partition_median(scratch)
 
-    def _modified_z_scores(self, data: np.ndarray) -> np.ndarray:
-        """Compute Modified Z-Scores for a 1-D array."""
-        median = np.median(data)
-        mad = np.median(np.abs(data - median))
+        # Fold the constant into the per-row scale so the full array is only
+        # multiplied once, in place on the signed deviations still held in
+        # the output buffer.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.multiply(scores, self.CONSISTENCY_CONSTANT / mad, out=scores)
 
-        if mad == 0:
+        if (mad == 0).any():
             # All values identical (or nearly so) — fall back to mean-based
             # z-score so we can still flag a single spike injected into
-            # constant data.
-            std = np.std(data)
-            if std == 0:
-                return np.zeros_like(data, dtype=float)
-            return np.abs(data - np.mean(data)) / std
+            # constant data. Rows with zero spread score 0 everywhere.
+            std = np.std(data, axis=-1, keepdims=True)
+            fallback = (data - np.mean(data, axis=-1, keepdims=True)) / np.where(std == 0, np.inf, std)
+            np.copyto(scores, fallback, where=mad == 0)
 
-        return np.abs(self.CONSISTENCY_CONSTANT * (data - median) / mad)
+        return scores
+
+    def _scores_for_key(self, key: bytes) -> np.ndarray:
+        """Score a ``(2, N)`` batch serialised with ``ndarray.tobytes``.
+
+        Backs the per-instance LRU cache, so the result is copied out of the
+        shared output buffer and made read-only.
+        """
+        data = np.frombuffer(key).reshape(2, -1)
+        scores = self._signed_modified_z_scores(data).copy()
+        scores.flags.writeable = False
+        return scores
 
     def detect(self, readings: list[dict]) -> list[dict]:
         """Analyse a batch of sensor readings and flag anomalies.
@@ -62,35 +201,137 @@ class AnomalyDetector:
             List of result dicts, one per input reading, each augmented with:
               - ``is_anomaly`` (bool)
               - ``anomaly_scores`` mapping metric names to their z-scores
+                (``None`` for normal readings unless ``verbose_scores``)
               - ``anomalous_metrics`` listing which metrics exceeded threshold
         """
         if not readings:
             return []
 
-        temperatures = np.array([r["temperature"] for r in readings], dtype=float)
-        vibrations = np.array([r["vibration"] for r in readings], dtype=float)
-
-        temp_scores = self._modified_z_scores(temperatures)
-        vib_scores = self._modified_z_scores(vibrations)
-
-        results = []
-        for i, reading in enumerate(readings):
-            anomalous_metrics = []
-            if temp_scores[i] > self.threshold:
-                anomalous_metrics.append("temperature")
-            if vib_scores[i] > self.threshold:
-                anomalous_metrics.append("vibration")
-
-            results.append({
-                "sensor_id": reading["sensor_id"],
-                "temperature": reading["temperature"],
-                "vibration": reading["vibration"],
-                "is_anomaly": len(anomalous_metrics) > 0,
-                "anomaly_scores": {
-                    "temperature": round(float(temp_scores[i]), 4),
-                    "vibration": round(float(vib_scores[i]), 4),
-                },
-                "anomalous_metrics": anomalous_metrics,
-            })
+        return self.detect_arrays(*split_readings(readings))
+
+    def detect_arrays(
+        self,
+        sensor_ids: list,
+        temperatures: Sequence[float] | np.ndarray,
+        vibrations: Sequence[float] | np.ndarray,
+    ) -> list[dict]:
+        """Analyse a batch already split into per-field columns.
+
+        Equivalent to :meth:`detect` but skips extracting the metrics from
+        reading dicts, for callers that build the columns while parsing.
+        Metric values are converted to float for scoring only; results echo
+        them as passed in.
+
+        Args:
+            sensor_ids: Sensor identifier for each reading.
+            temperatures: Temperature values (list or 1-D array).
+            vibrations: Vibration values (list or 1-D array), same length.
+
+        Returns:
+            List of result dicts in the same format as :meth:`detect`.
+
+        Raises:
+            ValueError: If the three columns differ in length or a metric
+                value is not numeric.
+        """
+        n = len(sensor_ids)
+        if len(temperatures) != n or len(vibrations) != n:
+            raise ValueError("sensor_ids, temperatures and vibrations must have the same length")
+        if not n:
+            return []
+
+        # Convert before any short-circuit so malformed values are rejected
+        # the same way at every batch size.
+        try:
+            data = np.array((temperatures, vibrations), dtype=float)
+        except (TypeError, ValueError) as exc:
+            raise ValueError("temperature and vibration values must be numeric") from exc
+
+        verbose = self.verbose_scores
+        if n < _MIN_BATCH_SIZE:
+            # Too few readings to score: report every one as normal.
+            anomaly_scores = (
+                [{"temperature": 0.0, "vibration": 0.0} for _ in range(n)]
+                if verbose else [None] * n
+            )
+            flagged = []
+        else:
+            anomaly_scores, flagged = self._score_batch(data)
+
+        # Build every row as normal, then revisit only the flagged ones —
+        # anomalies are rare, so this skips almost all per-row branching.
+        results = [
+            {
+                "sensor_id": sensor_id,
+                "temperature": temperature,
+                "vibration": vibration,
+                "is_anomaly": False,
+                "anomaly_scores": row_scores,
+                "anomalous_metrics": [],
+            }
+            for sensor_id, temperature, vibration, row_scores in zip(
+                sensor_ids, _as_list(temperatures), _as_list(vibrations), anomaly_scores,
+            )
+        ]
+        for i, metrics, row_scores in flagged:
+            result = results[i]
+            result["is_anomaly"] = True
+            result["anomalous_metrics"] = metrics
+            if row_scores is not None:
+                result["anomaly_scores"] = row_scores
 
         return results
+
+    def _score_batch(self, data: np.ndarray) -> tuple[list, list]:
+        """Score a ``(2, N)`` batch of at least ``_MIN_BATCH_SIZE`` readings.
+
+        Returns:
+            ``(anomaly_scores, flagged)``: the per-row ``anomaly_scores``
+            value (``None`` for every row unless ``verbose_scores``), and an
+            ``(index, anomalous_metrics, anomaly_scores)`` tuple for each
+            flagged reading, whose scores are ``None`` when already reported.
+        """
+        if self._cached_scores is not None and data.shape[-1] < _CACHEABLE_BATCH_SIZE:
+            scores = self._cached_scores(data.tobytes())
+        else:
+            scores = self._signed_modified_z_scores(data)
+
+        threshold = self.threshold
+        verbose = self.verbose_scores
+        if verbose:
+            # Every score is reported, so take magnitudes once and flag from
+            # those.
+            magnitudes = np.abs(scores)
+            temp_flags, vib_flags = magnitudes > threshold
+        else:
+            # Flag on the signed scores (exactly equivalent to |s| > t in
+            # float64) and take magnitudes only for the flagged rows, which
+            # are the only ones reported.
+            temp_flags, vib_flags = (scores > threshold) | (scores < -threshold)
+        anomalies = np.flatnonzero(temp_flags | vib_flags).tolist()
+        if not verbose:
+            magnitudes = np.abs(scores[:, anomalies])
+        temp_rounded, vib_rounded = np.round(magnitudes, 4, out=magnitudes).tolist()
+
+        if verbose:
+            anomaly_scores = [
+                {"temperature": temp_score, "vibration": vib_score}
+                for temp_score, vib_score in zip(temp_rounded, vib_rounded)
+            ]
+        else:
+            anomaly_scores = [None] * data.shape[-1]
+
+        flagged = []
+        for j, i in enumerate(anomalies):
+            metrics = []
+            if temp_flags[i]:
+                metrics.append("temperature")
+            if vib_flags[i]:
+                metrics.append("vibration")
+            row_scores = None if verbose else {
+                "temperature": temp_rounded[j],
+                "vibration": vib_rounded[j],
+            }
+            flagged.append((i, metrics, row_scores))
+
+        return anomaly_scores, flagged
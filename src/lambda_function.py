@@ -10,24 +10,47 @@ Example event (API Gateway proxy integration)::
     }
 """
 
-import json
 import logging
 from typing import Any
 
-from src.detector import AnomalyDetector
+import orjson
+
+from src.detector import AnomalyDetector, split_readings
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Instantiated at module level so the object is reused across warm invocations.
+REQUIRED_KEYS = frozenset({"sensor_id", "temperature", "vibration"})
+
+# Instantiated at module level so the objects are reused across warm invocations.
 detector = AnomalyDetector()
+# Serves ``?verbose=false`` requests, which only report scores for anomalies.
+quiet_detector = AnomalyDetector(verbose_scores=False)
+
+
+def _warm_up() -> None:
+    """Score a throwaway batch during Lambda init.
+
+    NumPy defers some imports and setup until the first median/partition
+    call; paying for that here keeps it out of the first real request. The
+    batch is larger than the small-batch cutoff so the partition path runs.
+    """
+    detector.detect([
+        {"sensor_id": "_warmup", "temperature": 70.0 + i, "vibration": 0.5 + 0.01 * i}
+        for i in range(64)
+    ])
+
+
+_warm_up()
 
 
 def _build_response(status_code: int, body: dict) -> dict:
     return {
         "statusCode": status_code,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(body),
+        # orjson encodes straight to UTF-8 bytes and is several times faster
+        # than json.dumps on large result lists.
+        "body": orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY).decode(),
     }
 
 
@@ -36,16 +59,17 @@ def lambda_handler(event: dict, context: Any) -> dict:
 
     Args:
         event: API Gateway proxy event with a JSON ``body`` containing a
-               ``readings`` list.
+               ``readings`` list. The ``verbose=false`` query parameter
+               limits ``anomaly_scores`` to flagged readings.
         context: Lambda context object (unused but required by the runtime).
 
     Returns:
         API Gateway-compatible response dict.
     """
     try:
-        body = event.get("body", "{}")
-        if isinstance(body, str):
-            body = json.loads(body)
+        body = event.get("body") or "{}"
+        if isinstance(body, (str, bytes, bytearray)):
+            body = orjson.loads(body)
 
         readings = body.get("readings")
         if not readings or not isinstance(readings, list):
@@ -53,15 +77,29 @@ def lambda_handler(event: dict, context: Any) -> dict:
                 "error": "Request must include a non-empty 'readings' list"
             })
 
-        required_keys = {"sensor_id", "temperature", "vibration"}
-        for idx, r in enumerate(readings):
-            missing = required_keys - r.keys()
-            if missing:
-                return _build_response(400, {
-                    "error": f"Reading at index {idx} is missing keys: {sorted(missing)}"
-                })
-
-        results = detector.detect(readings)
+        # Split into per-field columns up front so the detector never has to
+        # walk the reading dicts again. A missing key surfaces as a KeyError;
+        # only then is the batch rescanned to report which reading is bad.
+        try:
+            sensor_ids, temperatures, vibrations = split_readings(readings)
+        except KeyError:
+            for idx, r in enumerate(readings):
+                missing = REQUIRED_KEYS - r.keys()
+                if missing:
+                    return _build_response(400, {
+                        "error": f"Reading at index {idx} is missing keys: {sorted(missing)}"
+                    })
+            raise
+
+        params = event.get("queryStringParameters") or {}
+        verbose = str(params.get("verbose", "true")).lower() != "false"
+
+        try:
+            results = (detector if verbose else quiet_detector).detect_arrays(
+                sensor_ids, temperatures, vibrations
+            )
+        except ValueError as exc:
+            return _build_response(400, {"error": str(exc)})
 
         anomaly_count = sum(1 for r in results if r["is_anomaly"])
         logger.info("Processed %d readings — %d anomalies detected", len(results), anomaly_count)
@@ -72,7 +110,7 @@ def lambda_handler(event: dict, context: Any) -> dict:
             "results": results,
         })
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return _build_response(400, {"error": "Malformed JSON in request body"})
     except Exception:
         logger.exception("Unexpected error during processing")
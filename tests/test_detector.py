@@ -74,6 +74,16 @@ class TestAnomalyDetector:
     def test_empty_readings_returns_empty(self, detector):
         assert detector.detect([]) == []
 
+    def test_batches_below_three_are_not_scored(self):
+        lenient = AnomalyDetector(threshold=0.1)
+        readings = [
+            {"sensor_id": "a", "temperature": 70.0, "vibration": 0.5},
+            {"sensor_id": "b", "temperature": 500.0, "vibration": 9.0},
+        ]
+        results = lenient.detect(readings)
+        assert [r["is_anomaly"] for r in results] == [False, False]
+        assert all(r["anomaly_scores"] == {"temperature": 0.0, "vibration": 0.0} for r in results)
+
     def test_identical_values_no_false_positives(self, detector):
         readings = [
             {"sensor_id": f"s-{i}", "temperature": 70.0, "vibration": 0.5}
@@ -82,6 +92,53 @@ class TestAnomalyDetector:
         results = detector.detect(readings)
         assert all(not r["is_anomaly"] for r in results)
 
+    def test_spike_in_constant_metric_uses_fallback(self, detector, normal_readings):
+        # Temperature is constant apart from one spike (MAD == 0) while
+        # vibration varies normally; each metric is scored independently.
+        for r in normal_readings:
+            r["temperature"] = 70.0
+        normal_readings[5]["temperature"] = 90.0
+        results = detector.detect(normal_readings)
+        assert results[5]["anomalous_metrics"] == ["temperature"]
+        assert sum(r["is_anomaly"] for r in results) == 1
+
+    @pytest.mark.parametrize("n", [20, 21, 100, 101])
+    def test_scores_match_reference_formula(self, detector, n):
+        np.random.seed(n)
+        temps = np.random.normal(70, 2, n)
+        readings = [
+            {"sensor_id": f"s-{i}", "temperature": float(t), "vibration": 0.5 + 0.01 * i}
+            for i, t in enumerate(temps)
+        ]
+        median = np.median(temps)
+        mad = np.median(np.abs(temps - median))
+        expected = np.abs(AnomalyDetector.CONSISTENCY_CONSTANT * (temps - median) / mad)
+
+        results = detector.detect(readings)
+        scores = [r["anomaly_scores"]["temperature"] for r in results]
+        np.testing.assert_allclose(scores, expected, atol=1e-4)
+
+    @pytest.mark.parametrize("offset", [300.0, 1000.0])
+    def test_large_offset_small_spread_matches_reference(self, detector, offset):
+        # Values far from zero with a tiny spread: the deviations cancel
+        # almost all significant digits, so any precision loss in the median
+        # subtraction shows up directly in the scores and flags.
+        np.random.seed(7)
+        temps = offset + np.random.normal(0, 0.01, 101)
+        temps[3] = offset + 0.05
+        readings = [
+            {"sensor_id": f"s-{i}", "temperature": float(t), "vibration": 0.5 + 0.01 * i}
+            for i, t in enumerate(temps)
+        ]
+        median = np.median(temps)
+        mad = np.median(np.abs(temps - median))
+        expected = np.abs(AnomalyDetector.CONSISTENCY_CONSTANT * (temps - median) / mad)
+
+        results = detector.detect(readings)
+        scores = [r["anomaly_scores"]["temperature"] for r in results]
+        np.testing.assert_allclose(scores, expected, atol=5.1e-5)
+        assert [r["is_anomaly"] for r in results] == (expected > 3.5).tolist()
+
     def test_custom_threshold(self):
         # A lower threshold should flag more readings as anomalous
         strict = AnomalyDetector(threshold=1.0)
@@ -101,6 +158,72 @@ class TestAnomalyDetector:
         with pytest.raises(ValueError):
             AnomalyDetector(threshold=-1)
 
+    def test_detect_arrays_matches_detect(self, detector, normal_readings):
+        results = detector.detect_arrays(
+            [r["sensor_id"] for r in normal_readings],
+            np.array([r["temperature"] for r in normal_readings]),
+            np.array([r["vibration"] for r in normal_readings]),
+        )
+        assert results == detector.detect(normal_readings)
+
+    def test_detect_arrays_rejects_mismatched_columns(self, detector):
+        with pytest.raises(ValueError):
+            detector.detect_arrays(
+                ["a", "b", "c", "d", "e"],
+                np.array([70.0, 71.0, 72.0, 73.0]),
+                np.array([0.5, 0.5, 0.5, 0.5]),
+            )
+
+    def test_reused_detector_matches_fresh_instance(self, detector, normal_readings):
+        # Working buffers are reused between calls; a large batch followed
+        # by a smaller one must not leak state into the second result.
+        big = normal_readings * 5
+        detector.detect(big)
+        assert detector.detect(normal_readings) == AnomalyDetector(threshold=3.5).detect(normal_readings)
+
+    def test_repeated_batch_served_from_cache(self, detector, normal_readings):
+        first = detector.detect(normal_readings)
+        second = detector.detect(normal_readings)
+        assert first == second
+        assert detector._cached_scores.cache_info().hits == 1
+
+    def test_score_cache_can_be_disabled(self, detector, normal_readings):
+        uncached = AnomalyDetector(threshold=3.5, score_cache_size=0)
+        assert uncached._cached_scores is None
+        assert uncached.detect(normal_readings) == detector.detect(normal_readings)
+
+    def test_negative_cache_size_raises(self):
+        with pytest.raises(ValueError):
+            AnomalyDetector(score_cache_size=-1)
+
+    def test_non_verbose_scores_only_for_anomalies(self, normal_readings):
+        normal_readings.append({
+            "sensor_id": "sensor-spike",
+            "temperature": 200.0,
+            "vibration": 0.5,
+        })
+        verbose = AnomalyDetector(threshold=3.5).detect(normal_readings)
+        quiet = AnomalyDetector(threshold=3.5, verbose_scores=False).detect(normal_readings)
+        for v, q in zip(verbose, quiet):
+            assert q["is_anomaly"] == v["is_anomaly"]
+            assert q["anomalous_metrics"] == v["anomalous_metrics"]
+            if v["is_anomaly"]:
+                assert q["anomaly_scores"] == v["anomaly_scores"]
+            else:
+                assert q["anomaly_scores"] is None
+
+    def test_verbose_modes_agree_at_threshold(self):
+        # Verbose and quiet modes flag through different code paths but must
+        # always flag the same readings.
+        readings = [
+            {"sensor_id": f"s-{i}", "temperature": t, "vibration": 0.5}
+            for i, t in enumerate([-1.0, -1.0, 0.0, 1.0, 1.0, 5.0])
+        ]
+        for threshold in (1.349, 3.7, 6.745):
+            verbose = AnomalyDetector(threshold=threshold).detect(readings)
+            quiet = AnomalyDetector(threshold=threshold, verbose_scores=False).detect(readings)
+            assert [r["is_anomaly"] for r in verbose] == [r["is_anomaly"] for r in quiet]
+
     def test_result_schema(self, detector, normal_readings):
         results = detector.detect(normal_readings)
         for r in results:
@@ -136,6 +259,20 @@ class TestLambdaHandler:
         body = json.loads(response["body"])
         assert body["total_readings"] == 2
 
+    def test_reading_values_echoed_as_received(self):
+        event = self._make_event({
+            "readings": [
+                {"sensor_id": "p-01", "temperature": 70, "vibration": "0.5"},
+                {"sensor_id": "p-02", "temperature": 71.5, "vibration": 0.48},
+                {"sensor_id": "p-03", "temperature": 72, "vibration": 0.52},
+            ]
+        })
+        results = json.loads(lambda_handler(event, None)["body"])["results"]
+        assert [(r["temperature"], r["vibration"]) for r in results] == [
+            (70, "0.5"), (71.5, 0.48), (72, 0.52),
+        ]
+        assert type(results[0]["temperature"]) is int
+
     def test_missing_readings_key(self):
         event = self._make_event({"data": []})
         response = lambda_handler(event, None)
@@ -149,11 +286,58 @@ class TestLambdaHandler:
         assert response["statusCode"] == 400
         assert "missing keys" in json.loads(response["body"])["error"]
 
+    def test_missing_field_reports_index(self):
+        event = self._make_event({
+            "readings": [
+                {"sensor_id": "p-01", "temperature": 70, "vibration": 0.5},
+                {"sensor_id": "p-02", "temperature": 71},
+            ]
+        })
+        response = lambda_handler(event, None)
+        assert response["statusCode"] == 400
+        assert json.loads(response["body"])["error"] == (
+            "Reading at index 1 is missing keys: ['vibration']"
+        )
+
+    @pytest.mark.parametrize("n", [1, 5])
+    def test_non_numeric_value_rejected_at_any_batch_size(self, n):
+        readings = [
+            {"sensor_id": f"p-{i}", "temperature": 70 + i, "vibration": 0.5}
+            for i in range(n)
+        ]
+        readings[0]["temperature"] = "hot"
+        response = lambda_handler(self._make_event({"readings": readings}), None)
+        assert response["statusCode"] == 400
+        assert "numeric" in json.loads(response["body"])["error"]
+
     def test_malformed_json(self):
         event = {"body": "{not valid json}"}
         response = lambda_handler(event, None)
         assert response["statusCode"] == 400
 
+    def test_bytes_body_accepted(self):
+        body = json.dumps({
+            "readings": [{"sensor_id": "p-01", "temperature": 70, "vibration": 0.5}]
+        }).encode()
+        response = lambda_handler({"body": body}, None)
+        assert response["statusCode"] == 200
+
+    def test_null_body_is_bad_request(self):
+        response = lambda_handler({"body": None}, None)
+        assert response["statusCode"] == 400
+
+    def test_verbose_false_query_parameter(self):
+        readings = [
+            {"sensor_id": f"s-{i}", "temperature": 70.0 + 0.1 * i, "vibration": 0.5}
+            for i in range(20)
+        ]
+        readings.append({"sensor_id": "s-outlier", "temperature": 500.0, "vibration": 0.5})
+        event = self._make_event({"readings": readings})
+        event["queryStringParameters"] = {"verbose": "false"}
+        body = json.loads(lambda_handler(event, None)["body"])
+        assert body["anomalies_detected"] == 1
+        assert all((r["anomaly_scores"] is None) != r["is_anomaly"] for r in body["results"])
+
     def test_anomaly_flagged_in_response(self):
         readings = [
             {"sensor_id": f"s-{i}", "temperature": 70.0, "vibration": 0.5}